@@ -5,6 +5,7 @@ Batch-split double-page (spread) PDFs into single pages by cutting each page ver
 - Preserves original page size for each half (each output page is half the width).
 - Supports offset/ratio adjustments (e.g., for imprecise gutter/spine).
 - Handles page rotation.
+- Processes multiple input files in parallel (see --jobs).
 
 Usage:
   python split_spreads.py --input "/path/to/folder_or_file" --output "/path/to/output_folder"
@@ -22,6 +23,9 @@ Examples:
   # Add a small gutter gap (points) between halves (useful before booklet imposition)
   python split_spreads.py -i book.pdf -o ./out --gutter 6
 
+  # Process a folder with 2 worker processes (default: up to 4)
+  python split_spreads.py -i ./in -o ./out --jobs 2
+
 Requirements:
   pip install pypdf
 
@@ -34,11 +38,16 @@ import argparse
 import os
 import sys
 import glob
-import copy
+import io
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 try:
-    from pypdf import PdfReader, PdfWriter
+    from pypdf import PageObject, PdfWriter
+    from pypdf.generic import NameObject, RectangleObject
 except Exception as e:
     print("Error: this script requires the 'pypdf' package. Install with: pip install pypdf", file=sys.stderr)
     raise
@@ -46,79 +55,202 @@ except Exception as e:
 def iter_pdf_files(path_str: str):
     p = Path(path_str)
     if p.is_dir():
-        for ext in ("*.pdf", "*.PDF"):
-            yield from sorted(p.glob(ext))
+        # One directory pass; scandir entries carry cached file type info, so no extra stat() per entry.
+        with os.scandir(p) as it:
+            files = sorted(Path(e.path) for e in it if e.name.lower().endswith(".pdf") and e.is_file())
+        yield from files
     elif p.is_file() and p.suffix.lower() == ".pdf":
         yield p
     else:
         print(f"Warning: '{path_str}' is neither a PDF file nor a directory containing PDFs.", file=sys.stderr)
 
-def split_page(page, ratio=0.5, gutter=0.0, offset=0.0, vertical=True):
-    """
-    Return two page copies (left, right) cropped from the original by a vertical split.
-    ratio: position of split as fraction of width (0..1). 0.5 = middle.
-    gutter: extra gap (points) removed/added around the split (split pushes crops away by half gutter).
-    offset: shift split line horizontally (points), positive => shift right.
-    """
-
-    width = float(page.mediabox.width)
-    height = float(page.mediabox.height)
-
-    split = (width if vertical else height) * ratio + offset
-    pad = gutter / 2.0
-
-    # First half
-    first_llx = 0
-    first_lly = 0
-    first_urx = max(0.0, min(width, split - pad)) if vertical else width
-    first_ury = height if vertical else max(0.0, min(height, split - pad))
+# Output buffer size (bytes) used when writing result PDFs too large to serialize in memory.
+WRITE_BUFFER_SIZE = 1024 * 1024
 
-    # second half
-    second_llx = min(width, max(0.0, split + pad)) if vertical else 0
-    second_lly = 0 if vertical else min(height, max(0.0, split + pad))
-    second_urx = width
-    second_ury = height
+# Outputs expected to be larger than this (bytes) are streamed instead of written in one syscall.
+SINGLE_WRITE_MAX = 500 * 1024 * 1024
 
-    first = copy.deepcopy(page)
-    second = copy.deepcopy(page)
+def crop_halves(page, first_box, second_box):
+    """
+    Return two pages cropped to `first_box` and `second_box` (llx, lly, urx, ury).
+    The original page is reused as the first half.
+    """
+    # The second half is a shallow copy sharing the same /Contents, /Resources etc.,
+    # so content streams are never duplicated. Only the boxes differ.
+    first = page
+    second = PageObject(page.pdf)
+    second.update(page)
+
+    # Use /CropBox to define visible area, and shrink MediaBox to match so each new page is "physically" half-sized.
+    # Drop the /MediaBox assignments if you prefer to keep the original MediaBox.
+    first[NameObject("/CropBox")] = RectangleObject(first_box)
+    first[NameObject("/MediaBox")] = RectangleObject(first_box)
+    second[NameObject("/CropBox")] = RectangleObject(second_box)
+    second[NameObject("/MediaBox")] = RectangleObject(second_box)
 
-    # Use /CropBox to define visible area (do not change Mediabox to retain page size semantics if desired)
-    first.cropbox.lower_left = (first_llx, first_lly)
-    first.cropbox.upper_right = (first_urx, first_ury)
+    return first, second
 
-    second.cropbox.lower_left = (second_llx, second_lly)
-    second.cropbox.upper_right = (second_urx, second_ury)
+def vertical_rects(width, height, ratio=0.5, half_gutter=0.0, offset=0.0):
+    """
+    Return the (left, right) crop boxes for a vertical split of a width x height page.
+    ratio: position of split as fraction of width (0..1). 0.5 = middle.
+    half_gutter: half the gap (points) removed around the split; each crop is pushed away by this much.
+    offset: shift split line horizontally (points), positive => shift right.
+    """
+    split = width * ratio + offset
+    left_urx = max(0.0, min(width, split - half_gutter))
+    right_llx = min(width, max(0.0, split + half_gutter))
+    return (0, 0, left_urx, height), (right_llx, 0, width, height)
 
-    return first, second
+def horizontal_rects(width, height, ratio=0.5, half_gutter=0.0, offset=0.0):
+    """
+    Return the (bottom, top) crop boxes for a horizontal split of a width x height page.
+    ratio: position of split as fraction of height (0..1). 0.5 = middle.
+    half_gutter: half the gap (points) removed around the split; each crop is pushed away by this much.
+    offset: shift split line vertically (points), positive => shift up.
+    """
+    split = height * ratio + offset
+    bottom_ury = max(0.0, min(height, split - half_gutter))
+    top_lly = min(height, max(0.0, split + half_gutter))
+    return (0, 0, width, bottom_ury), (0, top_lly, width, height)
+
+def split_page_vertically(page, ratio=0.5, half_gutter=0.0, offset=0.0):
+    """Return two pages (left, right) cropped from the original by a vertical split. See vertical_rects."""
+    rects = vertical_rects(float(page.mediabox.width), float(page.mediabox.height), ratio, half_gutter, offset)
+    return crop_halves(page, *rects)
+
+def split_page_horizontally(page, ratio=0.5, half_gutter=0.0, offset=0.0):
+    """Return two pages (bottom, top) cropped from the original by a horizontal split. See horizontal_rects."""
+    rects = horizontal_rects(float(page.mediabox.width), float(page.mediabox.height), ratio, half_gutter, offset)
+    return crop_halves(page, *rects)
+
+def write_pdf(writer, out_path, size_hint=0):
+    """
+    Serialize `writer` into memory and write it to `out_path` with a single os.write().
+    size_hint: expected output size in bytes; above SINGLE_WRITE_MAX the output is streamed
+    through a WRITE_BUFFER_SIZE buffer instead, to avoid holding the whole file in memory.
+    """
+    if size_hint > SINGLE_WRITE_MAX:
+        # pypdf emits many small writes per object; collapse them with a large user-space buffer.
+        with open(out_path, "wb", buffering=0) as raw, io.BufferedWriter(raw, buffer_size=WRITE_BUFFER_SIZE) as f:
+            writer.write(f)
+        return
+
+    buf = io.BytesIO()
+    writer.write(buf)
+    data = buf.getbuffer()
+    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        # Normally one syscall; loop in case the OS accepts only part of the buffer.
+        written = 0
+        while written < len(data):
+            written += os.write(fd, data[written:])
+    finally:
+        os.close(fd)
+        data.release()
+
+def split_file(in_path: Path, orientation: str, ratio: float, gutter: float, offset: float):
+    """Return a PdfWriter holding the split pages of `in_path`. The input file is closed again on return."""
+    # Hand pypdf an open file rather than a path: given a path it reads the whole file into memory first.
+    # Cloning reads everything it needs, so the file can be closed before the output is written.
+    with open(in_path, "rb") as fh:
+        # Cheap sanity check, so non-PDF files fail fast instead of going through pypdf's recovery parsing.
+        if b"%PDF-" not in fh.read(1024):
+            raise ValueError("not a PDF file (no %PDF- header)")
+        fh.seek(0)
+
+        # Cloning carries over metadata and keeps every content stream and resource as a single object;
+        # the second half of each page is inserted right after it and points at the same objects.
+        writer = PdfWriter(clone_from=fh)
+
+    # Resolve everything that is constant for the file once, outside the page loop.
+    rects_fn = vertical_rects if orientation == "vertical" else horizontal_rects
+    half_gutter = gutter / 2.0
+    pages = writer.pages
+    insert_page = writer.insert_page
+
+    # Crop boxes only depend on the page size, which rarely varies within a file.
+    rect_cache = {}
+
+    # Walk backwards so inserting a second half does not shift the pages still to visit.
+    for i in range(len(pages) - 1, -1, -1):
+        page = pages[i]
+        # Read the raw /MediaBox numbers instead of going through the mediabox property;
+        # flattened pages carry inherited boxes too.
+        box = page.get("/MediaBox") or page.mediabox
+        key = (box[2] - box[0], box[3] - box[1])
+        rects = rect_cache.get(key)
+        if rects is None:
+            rects = rect_cache[key] = rects_fn(key[0], key[1], ratio, half_gutter, offset)
+
+        # The page itself becomes the first half
+        _, second = crop_halves(page, *rects)
+        insert_page(second, i + 1)
+
+    return writer
+
+def output_path(in_path: Path, out_dir: Path, suffix: str):
+    return out_dir / (in_path.stem + suffix + in_path.suffix)
 
 def process_file(in_path: Path, out_dir: Path, orientation: str, ratio: float, gutter: float, offset: float, suffix: str):
-    reader = PdfReader(str(in_path))
-    writer = PdfWriter()
+    writer = split_file(in_path, orientation, ratio, gutter, offset)
 
-    # carry over document metadata
-    if reader.metadata:
-        writer.add_metadata(reader.metadata)
-
-    for idx, page in enumerate(reader.pages, start=1):
-        # Create two new pages from each original
-        p1, p2 = split_page(page, ratio=ratio, gutter=gutter, offset=offset, vertical=orientation == "vertical")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = output_path(in_path, out_dir, suffix)
+    # The output shares the input's content streams, so its size tracks the input's.
+    write_pdf(writer, out_path, size_hint=in_path.stat().st_size)
 
-        # Optionally, shrink resulting pages' MediaBox to the crop box, so each new page is "physically" half-sized.
-        # Comment out next block if you prefer to keep original MediaBox.
-        for p in (p1, p2):
-            p.mediabox.lower_left = p.cropbox.lower_left
-            p.mediabox.upper_right = p.cropbox.upper_right
+    return out_path
 
-        writer.add_page(p1)
-        writer.add_page(p2)
+def process_file_safe(in_path: Path, **kwargs):
+    """
+    Like process_file, but return (in_path, out_path, error) instead of raising,
+    so one corrupt PDF does not abort a whole batch. error is None on success.
+    """
+    try:
+        return in_path, process_file(in_path, **kwargs), None
+    except Exception as e:
+        return in_path, None, repr(e)
 
+def process_serially(inputs, out_dir: Path, orientation: str, ratio: float, gutter: float, offset: float, suffix: str):
+    """
+    Process `inputs` one after another, yielding (in_path, out_path, error) like process_file_safe.
+    Each result is written on a background thread while the next file is parsed and split.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-    out_name = in_path.stem + suffix + in_path.suffix
-    out_path = out_dir / out_name
-    with open(out_path, "wb") as f:
-        writer.write(f)
-
-    return out_path
+    # Keep only a couple of writes in flight so finished documents do not pile up in memory.
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=2) as io_pool:
+        for p in inputs:
+            try:
+                writer = split_file(p, orientation, ratio, gutter, offset)
+            except Exception as e:
+                yield p, None, repr(e)
+                continue
+            out_path = output_path(p, out_dir, suffix)
+            pending.append((p, out_path, io_pool.submit(write_pdf, writer, out_path, p.stat().st_size)))
+            while len(pending) > 2:
+                yield _write_result(*pending.popleft())
+        while pending:
+            yield _write_result(*pending.popleft())
+
+def _write_result(in_path, out_path, future):
+    try:
+        future.result()
+    except Exception as e:
+        return in_path, None, repr(e)
+    return in_path, out_path, None
+
+def report_results(results):
+    """Print each (in_path, out_path, error) result as it arrives and return the failed (in_path, error) pairs."""
+    failed = []
+    for in_path, out_path, err in results:
+        if err is None:
+            print(f"✔ Wrote: {out_path}")
+        else:
+            print(f"✘ Failed: {in_path}: {err}", file=sys.stderr)
+            failed.append((in_path, err))
+    return failed
 
 def main():
     ap = argparse.ArgumentParser(description="Split double-page spreads into single pages.")
@@ -134,6 +266,8 @@ def main():
                     help="Additional absolute shift (points) of split line. Positive shifts right (vertical) or up (horizontal). Default: 0")
     ap.add_argument("--suffix", type=str, default="_split",
                     help="Suffix appended to filename before .pdf. Default: _split")
+    ap.add_argument("-j", "--jobs", type=int, default=0,
+                    help="Number of files processed in parallel. 0 means min(CPU count, 4). Default: 0")
 
     args = ap.parse_args()
 
@@ -145,17 +279,29 @@ def main():
     out_dir = Path(args.output)
 
     print(f"Processing {len(inputs)} file(s)...")
-    for p in inputs:
-        out_path = process_file(
-            in_path=p,
-            out_dir=out_dir,
-            orientation=args.orientation,
-            ratio=args.ratio,
-            gutter=args.gutter,
-            offset=args.offset,
-            suffix=args.suffix,
-        )
-        print(f"✔ Wrote: {out_path}")
+    options = dict(
+        out_dir=out_dir,
+        orientation=args.orientation,
+        ratio=args.ratio,
+        gutter=args.gutter,
+        offset=args.offset,
+        suffix=args.suffix,
+    )
+
+    # Files are independent; cap the pool since the write phase is bound by disk bandwidth anyway.
+    jobs = args.jobs if args.jobs > 0 else min(os.cpu_count() or 1, 4)
+    jobs = min(jobs, len(inputs))
+    if jobs == 1:
+        failed = report_results(process_serially(inputs, **options))
+    else:
+        with mp.Pool(jobs) as pool:
+            failed = report_results(pool.imap_unordered(partial(process_file_safe, **options), inputs, chunksize=1))
+
+    print(f"Done: {len(inputs) - len(failed)} written, {len(failed)} failed.")
+    if failed:
+        for in_path, err in failed:
+            print(f"  {in_path}: {err}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()